@@ -14,7 +14,7 @@ async function startDevServer() {
       "src/static/ts/authWebhook.ts",
       // "src/static/ts/analytics-init.ts",
       "src/static/ts/types/custom_types.ts",
-      "src/static/ts/types/pydantic_types.ts",
+      "src/static/ts/types/pydantic_models.ts",
     ],
     bundle: true,
     outdir: "src/dist",
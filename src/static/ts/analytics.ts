@@ -19,7 +19,6 @@ import {
   VisibilityState,
   AnalyticsBatch,
 } from "./types/pydantic_models";
-import { openDB } from "idb";
 import { QueuedEvent, AnalyticsEventUnion } from "./types/custom_types";
 import { EventTypesEnum } from "./types/custom_types";
 
@@ -48,12 +47,13 @@ class RingBuffer<T> {
   }
 
   drain(): T[] {
-    const items: T[] = [];
-    while (this._size > 0) {
-      items.push(this.buffer[this.tail]);
+    // The item count is known, so size the result once instead of growing it
+    const items: T[] = new Array(this._size);
+    for (let i = 0; i < items.length; i++) {
+      items[i] = this.buffer[this.tail];
       this.tail = (this.tail + 1) % this.capacity;
-      this._size--;
     }
+    this._size = 0;
     return items;
   }
 
@@ -62,11 +62,79 @@ class RingBuffer<T> {
   }
 }
 
+const GLOBAL_SESSION_KEY = "globe_analytics_session";
+const SESSION_TIMEOUT = 30 * 60 * 1000; // 30 minutes
+
+// Elements observed for visibility tracking when analytics starts
+const IMPORTANT_ELEMENT_SELECTOR = [
+  // Interactive elements
+  "button",
+  "a",
+  "form",
+  "input",
+  "select",
+  "textarea",
+  // Content elements
+  "article",
+  "section",
+  "main",
+  "header",
+  "footer",
+  // Custom trackable elements
+  "[data-track-visibility]",
+  "[data-analytics-id]",
+  // Important content
+  "h1",
+  "h2",
+  "img",
+  "video",
+  // Interactive components
+  '[role="button"]',
+  '[role="tab"]',
+  '[role="dialog"]',
+  // Custom components
+  ".component",
+  ".widget",
+  ".modal",
+].join(",");
+
+// Elements that interaction and visibility handlers are allowed to track
+const TRACKABLE_ELEMENT_SELECTOR = [
+  "[data-track-visibility]",
+  "[data-analytics-id]",
+  "button",
+  "a",
+  "form",
+  "input",
+  "select",
+  "textarea",
+  "div",
+  "article",
+  "section",
+  "main",
+  "header",
+  "footer",
+  "h1",
+  "h2",
+  "img",
+  "video",
+  '[role="button"]',
+  ".component",
+  ".widget",
+  ".modal",
+].join(",");
+
+// Form field names that are never collected
+const SENSITIVE_FIELD_PATTERN = /password|token|credit|card/i;
+
+// Browser details that stay fixed while the page is open
+type StaticBrowserInfo = Omit<BrowserInfo, "language" | "time_zone_offset">;
+
 interface PrivacySettings {
   gdprConsent: boolean;
   ccpaCompliance: boolean;
   dataRetentionDays: number;
-  allowedDataTypes: EventTypes[];
+  allowedDataTypes: Set<EventTypes>;
   ipAnonymization: boolean;
   sensitiveDataFields: string[];
   cookiePreferences: {
@@ -97,6 +165,7 @@ class Analytics {
   private readonly scrollThresholds = new Set<number>();
   private mediaElements = new WeakMap<HTMLMediaElement, MediaData>();
   private privacySettings!: PrivacySettings;
+  private browserInfo: StaticBrowserInfo | null = null;
 
   // Performance monitoring
   private readonly performanceMetrics = new Map<string, number>();
@@ -184,7 +253,9 @@ class Analytics {
       gdprConsent: true,
       ccpaCompliance: true,
       dataRetentionDays: 90,
-      allowedDataTypes: Object.values(EventTypesEnum) as EventTypes[],
+      allowedDataTypes: new Set(
+        Object.values(EventTypesEnum) as EventTypes[]
+      ),
       ipAnonymization: false,
       sensitiveDataFields: [],
       cookiePreferences: {
@@ -224,7 +295,6 @@ class Analytics {
       this.setupErrorTracking();
       this.setupConversionTracking();
       this.setupPerformanceTracking();
-      this.setupMediaTracking();
       this.setupScrollTracking();
       this.startSession();
     } catch (error) {
@@ -242,8 +312,6 @@ class Analytics {
   }
 
   private async initializeSession(): Promise<void> {
-    const GLOBAL_SESSION_KEY = "globe_analytics_session";
-
     try {
       let storage: { [key: string]: any };
 
@@ -257,7 +325,6 @@ class Analytics {
       }
 
       const existingSession = storage[GLOBAL_SESSION_KEY];
-      const SESSION_TIMEOUT = 30 * 60 * 1000; // 30 minutes
 
       if (existingSession) {
         const session =
@@ -345,11 +412,11 @@ class Analytics {
   }
 
   private setupSessionTimeout(): void {
-    const GLOBAL_SESSION_KEY = "globe_analytics_session";
-    const SESSION_TIMEOUT = 30 * 60 * 1000; // 30 minutes
+    // Minimum time (in ms) between persisted activity updates
+    const ACTIVITY_WRITE_INTERVAL = 5000;
+    let lastActivityWrite = 0;
 
-    // Update last activity time on user interaction
-    const updateActivity = () => {
+    const persistActivity = () => {
       const session = localStorage.getItem(GLOBAL_SESSION_KEY);
       if (session) {
         const sessionData = JSON.parse(session);
@@ -358,6 +425,16 @@ class Analytics {
       }
     };
 
+    // Update last activity time on user interaction. Interaction events fire
+    // far more often than the session timeout needs, so skip the storage
+    // round trip unless the last write is older than the write interval.
+    const updateActivity = () => {
+      const now = Date.now();
+      if (now - lastActivityWrite < ACTIVITY_WRITE_INTERVAL) return;
+      lastActivityWrite = now;
+      persistActivity();
+    };
+
     // Track user activity
     ["click", "mousemove", "keypress", "scroll", "touchstart"].forEach(
       (event) => {
@@ -395,7 +472,7 @@ class Analytics {
 
     // Handle page unload
     window.addEventListener("beforeunload", () => {
-      updateActivity(); // Update last activity before unload
+      persistActivity(); // Update last activity before unload
     });
   }
 
@@ -408,7 +485,7 @@ class Analytics {
     });
 
     // Clear session storage
-    localStorage.removeItem("globe_analytics_session");
+    localStorage.removeItem(GLOBAL_SESSION_KEY);
     this.sessionId = null;
   }
 
@@ -488,39 +565,7 @@ class Analytics {
   }
 
   private observeImportantElements(observer: IntersectionObserver): void {
-    const selectors = [
-      // Interactive elements
-      "button",
-      "a",
-      "form",
-      "input",
-      "select",
-      "textarea",
-      // Content elements
-      "article",
-      "section",
-      "main",
-      "header",
-      "footer",
-      // Custom trackable elements
-      "[data-track-visibility]",
-      "[data-analytics-id]",
-      // Important content
-      "h1",
-      "h2",
-      "img",
-      "video",
-      // Interactive components
-      '[role="button"]',
-      '[role="tab"]',
-      '[role="dialog"]',
-      // Custom components
-      ".component",
-      ".widget",
-      ".modal",
-    ].join(",");
-
-    document.querySelectorAll(selectors).forEach((element) => {
+    document.querySelectorAll(IMPORTANT_ELEMENT_SELECTOR).forEach((element) => {
       if (this.shouldTrackElement(element)) {
         observer.observe(element);
       }
@@ -551,23 +596,12 @@ class Analytics {
   }
 
   private shouldTrackElement(element: Element): boolean {
+    // Match the selector first; measuring the element can force a layout
+    if (!element.matches(TRACKABLE_ELEMENT_SELECTOR)) return false;
+
     // Skip elements that are too small
     const rect = element.getBoundingClientRect();
-    if (rect.width < 10 || rect.height < 10) return false;
-
-    // Track elements that:
-    if (element.hasAttribute("data-track-visibility")) return true;
-    if (element.hasAttribute("data-analytics-id")) return true;
-    if (element.matches("button, a, form, input, select, textarea, div"))
-      return true;
-    if (element.matches("article, section, main, header, footer")) return true;
-    if (element.matches("h1, h2, img, video")) return true;
-    if (element.getAttribute("role") === "button") return true;
-    if (element.classList.contains("component")) return true;
-    if (element.classList.contains("widget")) return true;
-    if (element.classList.contains("modal")) return true;
-
-    return false;
+    return rect.width >= 10 && rect.height >= 10;
   }
 
   private handleVisibility = (): void => {
@@ -670,7 +704,7 @@ class Analytics {
         country: "",
         region: "",
         city: "",
-        timezone: Intl.DateTimeFormat().resolvedOptions().timeZone,
+        timezone: this.getBrowserInfo().time_zone,
       };
 
       this.queueEvent(EventTypesEnum.location, locationData);
@@ -768,7 +802,7 @@ class Analytics {
 
   private shouldTrackEvent(type: EventTypes): boolean {
     return (
-      this.privacySettings.allowedDataTypes.includes(type) &&
+      this.privacySettings.allowedDataTypes.has(type) &&
       this.privacySettings.cookiePreferences.analytics
     );
   }
@@ -781,7 +815,7 @@ class Analytics {
 
     const event: QueuedEvent = {
       id: crypto.randomUUID(),
-      event_type: type.toLowerCase() as EventTypes,
+      event_type: type,
       data,
       timestamp: Date.now(),
     };
@@ -827,25 +861,6 @@ class Analytics {
       .then((buffer) => new Uint8Array(buffer));
   }
 
-  private async storeForRetry(events: QueuedEvent[]): Promise<void> {
-    const db = await openDB("analytics", 1, {
-      upgrade(db) {
-        db.createObjectStore("failed_events", { keyPath: "timestamp" });
-      },
-    });
-
-    const analyticsEvents = this.transformQueuedEvents(events);
-
-    const tx = db.transaction("failed_events", "readwrite");
-    const store = tx.objectStore("failed_events");
-
-    await Promise.all(
-      analyticsEvents.map((event) =>
-        store.add({ ...event, timestamp: Date.now() })
-      )
-    );
-  }
-
   private handleClick = (event: MouseEvent): void => {
     if (!this.shouldTrackEvent(EventTypesEnum.click)) return;
 
@@ -911,7 +926,7 @@ class Analytics {
 
       if (current.id) {
         selector += `#${current.id}`;
-        path.unshift(selector);
+        path.push(selector);
         break; // ID is unique, no need to go further
       } else {
         const classes = Array.from(current.classList)
@@ -928,11 +943,13 @@ class Analytics {
         }
       }
 
-      path.unshift(selector);
+      path.push(selector);
       current = current.parentElement;
     }
 
-    return path.join(" > ");
+    // Built leaf-first; appending and reversing once avoids shifting the
+    // array on every ancestor
+    return path.reverse().join(" > ");
   }
 
   private getElementText(element: Element): string {
@@ -1021,15 +1038,22 @@ class Analytics {
     // Implement fallback processing
   };
 
+  // Build the static browser details once rather than on every batch flush;
+  // language and time zone offset can change mid-page, so read them each call
   private getBrowserInfo(): BrowserInfo {
+    if (!this.browserInfo) {
+      this.browserInfo = {
+        user_agent: navigator.userAgent,
+        platform: navigator.platform,
+        vendor: navigator.vendor || "",
+        cookies_enabled: navigator.cookieEnabled,
+        do_not_track: navigator.doNotTrack === "1",
+        time_zone: Intl.DateTimeFormat().resolvedOptions().timeZone,
+      };
+    }
     return {
-      user_agent: navigator.userAgent,
+      ...this.browserInfo,
       language: navigator.language,
-      platform: navigator.platform,
-      vendor: navigator.vendor || "",
-      cookies_enabled: navigator.cookieEnabled,
-      do_not_track: navigator.doNotTrack === "1",
-      time_zone: Intl.DateTimeFormat().resolvedOptions().timeZone,
       time_zone_offset: new Date().getTimezoneOffset(),
     };
   }
@@ -1087,15 +1111,13 @@ class Analytics {
         scrollDelta >= MIN_SCROLL_DISTANCE &&
         now - lastScrollTime >= SCROLL_THROTTLE
       ) {
+        const maxDepth =
+          document.documentElement.scrollHeight - window.innerHeight;
         const scrollData: ScrollData = {
           depth: currentY,
           direction: currentY > lastScrollY ? "down" : "up",
-          max_depth: document.documentElement.scrollHeight - window.innerHeight,
-          relative_depth: Math.round(
-            (currentY /
-              (document.documentElement.scrollHeight - window.innerHeight)) *
-              100
-          ),
+          max_depth: maxDepth,
+          relative_depth: Math.round((currentY / maxDepth) * 100),
         };
 
         this.queueEvent(EventTypesEnum.scroll, scrollData);
@@ -1113,20 +1135,18 @@ class Analytics {
         if (!this.shouldTrackEvent(EventTypesEnum.scroll)) return;
 
         // Only send final position if it's different from last tracked position
-        if (Math.abs(window.scrollY - lastScrollY) >= MIN_SCROLL_DISTANCE) {
+        const finalY = window.scrollY;
+        if (Math.abs(finalY - lastScrollY) >= MIN_SCROLL_DISTANCE) {
+          const maxDepth =
+            document.documentElement.scrollHeight - window.innerHeight;
           const finalScrollData: ScrollData = {
-            depth: window.scrollY,
+            depth: finalY,
             direction: "final",
-            max_depth:
-              document.documentElement.scrollHeight - window.innerHeight,
-            relative_depth: Math.round(
-              (window.scrollY /
-                (document.documentElement.scrollHeight - window.innerHeight)) *
-                100
-            ),
+            max_depth: maxDepth,
+            relative_depth: Math.round((finalY / maxDepth) * 100),
           };
           this.queueEvent(EventTypesEnum.scroll, finalScrollData);
-          lastScrollY = window.scrollY;
+          lastScrollY = finalY;
         }
       }, SCROLL_DEBOUNCE);
     };
@@ -1157,12 +1177,7 @@ class Analytics {
 
         // Only collect safe, non-sensitive form fields
         formData.forEach((value, key) => {
-          if (
-            !key.toLowerCase().includes("password") &&
-            !key.toLowerCase().includes("token") &&
-            !key.toLowerCase().includes("credit") &&
-            !key.toLowerCase().includes("card")
-          ) {
+          if (!SENSITIVE_FIELD_PATTERN.test(key)) {
             safeFormData[key] =
               typeof value === "string" ? value : "file-upload";
           }
@@ -1347,18 +1362,24 @@ class Analytics {
     });
   };
   private transformQueuedEvents(events: QueuedEvent[]): AnalyticsEventUnion[] {
+    // Every event in a batch is sent at the same moment, from the same page
+    const timestamp = new Date().toISOString();
+    const domain = window.location.hostname;
+    const url = window.location.href;
+    const referrer = document.referrer || null;
+
     return events.map((event) => {
-      // Create base event object that matches the Event interface
+      // Build the event in a single object that matches the Event interface
       const baseEvent = {
         event_id: event.id,
         user_id: this.user_id,
         session_id: this.sessionId!,
-        timestamp: new Date().toISOString(),
+        timestamp,
         client_timestamp: new Date(event.timestamp).toISOString(),
         event_type: event.event_type,
-        domain: window.location.hostname,
-        url: window.location.href,
-        referrer: document.referrer || null,
+        domain,
+        url,
+        referrer,
         data: event.data,
       };
 
@@ -1366,18 +1387,11 @@ class Analytics {
       if (event.event_type === "custom") {
         return {
           ...baseEvent,
-          event_type: "custom" as const,
           name: (event.data as { name: string }).name,
-          data: event.data as Record<string, unknown>,
         } as any;
       }
 
-      // For all other events, ensure event_type is correctly typed
-      return {
-        ...baseEvent,
-        event_type: event.event_type,
-        data: event.data,
-      } as AnalyticsEventUnion;
+      return baseEvent as AnalyticsEventUnion;
     });
   }
 
@@ -1,5 +1,4 @@
 // analytics.worker.ts
-import axios from "axios";
 import {
   EventTypes,
   BrowserInfo,
@@ -54,14 +53,32 @@ interface AnalyticsBatch {
 
 // IndexedDB setup
 let db: IDBDatabase | null = null;
+let dbReady: Promise<void> | null = null;
 
-async function initializeDB(): Promise<void> {
-  return new Promise((resolve, reject) => {
+function resetDB(database: IDBDatabase): void {
+  if (db !== database) return;
+  dbReady = null;
+  db = null;
+}
+
+function initializeDB(): Promise<void> {
+  // Share one pending open between concurrent messages; the cache is reset
+  // when the open fails or the connection closes so the next message reopens
+  dbReady ??= new Promise((resolve, reject) => {
     const request = indexedDB.open(CONFIG.DB_NAME, CONFIG.DB_VERSION);
 
-    request.onerror = () => reject(new Error("Failed to open IndexedDB"));
+    request.onerror = () => {
+      dbReady = null;
+      reject(new Error("Failed to open IndexedDB"));
+    };
     request.onsuccess = (event) => {
-      db = (event.target as IDBOpenDBRequest).result;
+      const database = (event.target as IDBOpenDBRequest).result;
+      database.onclose = () => resetDB(database);
+      database.onversionchange = () => {
+        database.close();
+        resetDB(database);
+      };
+      db = database;
       resolve();
     };
     request.onupgradeneeded = (event) => {
@@ -74,41 +91,26 @@ async function initializeDB(): Promise<void> {
       }
     };
   });
+  return dbReady;
 }
 
 // Message handling
 self.onmessage = async (event: MessageEvent<WorkerMessage>) => {
   try {
     await initializeDB();
+    // postMessage has already structured-cloned the payload, so it is a
+    // private copy and safe to use and store as-is
     const { type, ...data } = event.data;
 
-    // Create a structured clone-safe copy of the data
-    const safeData = {
-      ...data,
-      events: data.events?.map((event) => ({
-        ...event,
-        data: JSON.parse(JSON.stringify(event.data)), // Ensure data is clone-safe
-      })),
-      browser: data.browser
-        ? JSON.parse(JSON.stringify(data.browser))
-        : undefined,
-      device: data.device ? JSON.parse(JSON.stringify(data.device)) : undefined,
-      network: data.network
-        ? JSON.parse(JSON.stringify(data.network))
-        : undefined,
-    };
-
     switch (type) {
       case "PROCESS_BATCH":
-        await processBatch(safeData);
+        await processBatch(data);
         break;
       case "START_SESSION":
-        await startSession(
-          safeData as Required<Pick<WorkerMessage, "session">>
-        );
+        await startSession(data as Required<Pick<WorkerMessage, "session">>);
         break;
       case "END_SESSION":
-        await endSession(safeData);
+        await endSession(data);
         break;
       case "RETRY_FAILED":
         await retryFailedBatches();
@@ -127,17 +129,20 @@ async function processBatch(
   const { events, sessionId, device, browser, network } = message;
 
   try {
-    const validatedEvents = events
-      ?.map((event) => ({
+    // Stamp and validate in one pass rather than chaining map/map/filter,
+    // which allocated an intermediate array per step
+    const validatedEvents: AnalyticsEventUnion[] = [];
+    for (const event of events ?? []) {
+      const stamped = {
         ...event,
         event_id: event.event_id || crypto.randomUUID(),
-        user_id: event.user_id,
         session_id: sessionId,
-      }))
-      ?.map((event) => validateEvent(event))
-      ?.filter((event): event is AnalyticsEventUnion => event !== null);
+      };
+      const validated = validateEvent(stamped);
+      if (validated) validatedEvents.push(validated);
+    }
 
-    if (!validatedEvents?.length) {
+    if (!validatedEvents.length) {
       throw new Error("No valid events in batch");
     }
 
@@ -165,11 +170,15 @@ async function startSession(
   };
 
   try {
-    const { data } = await axios.post(
-      `${CONFIG.API_URL}/sessions`,
-      sessionData
-    );
-    return data;
+    const response = await fetch(`${CONFIG.API_URL}/sessions`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify(sessionData),
+    });
+
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
   } catch (error) {
     throw error;
   }
@@ -180,13 +189,15 @@ async function endSession({
 }: Pick<WorkerMessage, "sessionId">): Promise<void> {
   try {
     const end_time = new Date().toISOString();
-    await axios.patch(
-      `${CONFIG.API_URL}/sessions/${sessionId}`,
-      { end_time },
-      {
-        headers: { "Content-Type": "application/json" },
-      }
-    );
+    const response = await fetch(`${CONFIG.API_URL}/sessions/${sessionId}`, {
+      method: "PATCH",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ end_time }),
+    });
+
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
   } catch (error) {
     throw error;
   }
@@ -195,12 +206,12 @@ async function endSession({
 // Event validation
 function validateEvent(event: AnalyticsEventUnion): AnalyticsEventUnion | null {
   try {
-    if (event.event_type.toLowerCase() === EventTypesEnum.visibility) {
+    const eventType = event.event_type.toLowerCase() as EventTypes;
+
+    if (eventType === EventTypesEnum.visibility) {
       return null;
     }
 
-    const eventType = event.event_type.toLowerCase() as EventTypes;
-
     if (!event.url || !event.domain) {
       return null;
     }
@@ -239,12 +250,25 @@ function validateEventData(type: EventTypes, data: unknown): boolean {
 }
 
 // compression
+const BASE64_CHUNK_SIZE = 0x8000; // 32KB
+
+// Spreading a whole buffer into String.fromCharCode exceeds the engine's
+// argument limit on large batches, so convert it in fixed-size slices.
+function toBase64(bytes: Uint8Array): string {
+  let binary = "";
+  for (let i = 0; i < bytes.length; i += BASE64_CHUNK_SIZE) {
+    binary += String.fromCharCode(...bytes.subarray(i, i + BASE64_CHUNK_SIZE));
+  }
+  return btoa(binary);
+}
+
 const compressBatch = async (
   batch: AnalyticsBatch
 ): Promise<{ data: string; encoding: string }> => {
   try {
     const jsonString = JSON.stringify(batch);
-    const originalSize = new Blob([jsonString]).size;
+    const rawData = new TextEncoder().encode(jsonString);
+    const originalSize = rawData.byteLength;
 
     if (originalSize < CONFIG.COMPRESSION_THRESHOLD) {
       return {
@@ -253,24 +277,21 @@ const compressBatch = async (
       };
     }
 
-    const encoder = new TextEncoder();
-    const rawData = encoder.encode(jsonString);
     const cs = new CompressionStream("gzip");
     const compressedStream = new Blob([rawData]).stream().pipeThrough(cs);
     const compressedData = await new Response(compressedStream).arrayBuffer();
-    const base64Data = btoa(
-      String.fromCharCode(...new Uint8Array(compressedData))
-    );
-
-    console.log("Compressed data", base64Data);
-    const compressedSize = new Blob([base64Data]).size;
-    const compressionRatio = (
-      ((originalSize - compressedSize) / originalSize) *
-      100
-    ).toFixed(2);
-    console.log(
-      `Compression ratio: ${compressionRatio}% (${originalSize} -> ${compressedSize} bytes)`
-    );
+    const base64Data = toBase64(new Uint8Array(compressedData));
+
+    if (isDevelopment()) {
+      const compressedSize = base64Data.length; // base64 is single-byte ASCII
+      const compressionRatio = (
+        ((originalSize - compressedSize) / originalSize) *
+        100
+      ).toFixed(2);
+      console.log(
+        `Compression ratio: ${compressionRatio}% (${originalSize} -> ${compressedSize} bytes)`
+      );
+    }
 
     return {
       data: base64Data,
@@ -298,18 +319,19 @@ async function sendBatchToAPI(
   compressedData?: { data: string; encoding: string }
 ): Promise<boolean> {
   try {
-    // Ensure the batch data is clone-safe
-    const safeBatch = JSON.parse(JSON.stringify(batch));
-
-    safeBatch.events.forEach((event: AnalyticsEventUnion) => {
-      event.user_id = user_id;
-    });
+    // Stamp the user id onto shallow copies; the batch is serialized below
+    const userBatch: AnalyticsBatch = {
+      events: batch.events.map((event) => ({ ...event, user_id })),
+    };
 
-    // Only compress if we don't have compressed data from a previous attempt
-    const { data, encoding } =
-      compressedData || (await compressBatch(safeBatch));
+    // Only compress if we don't have compressed data from a previous attempt.
+    // Keep the result on the parameter so the retry below can reuse it.
+    compressedData = compressedData || (await compressBatch(userBatch));
+    const { data, encoding } = compressedData;
 
-    console.log("Sending batch to API", safeBatch);
+    if (isDevelopment()) {
+      console.log("Sending batch to API", userBatch);
+    }
     const response = await fetch(`${CONFIG.API_URL}/analytics/batch`, {
       method: "POST",
       headers: {